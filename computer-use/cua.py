@@ -1,16 +1,20 @@
-import base64
+import asyncio
 import io
 import json
 import logging
+import random
 import re
-import time
 import typing
 
 import openai
 import PIL
+import pybase64
 
 logger = logging.getLogger(__name__)
 
+_RATELIMIT_RE = re.compile(r"Please try again in (\d+)s")
+_MAX_BACKOFF = 60
+
 
 class State:
     "Tracking and controlling the state."
@@ -20,8 +24,7 @@ class State:
         "user_interaction", "computer_call_output", "function_call"
     ] = ""
     call_id: str = ""
-    computer_action: str = ""
-    computer_action_args: dict = {}
+    computer_calls: list = []
     pending_safety_checks: list = []
     reasoning_summary: str = ""
     message: str = ""
@@ -29,16 +32,29 @@ class State:
     def __init__(self, response):
         assert response.status == "completed"
         self.previous_response_id = response.id
+        self.computer_calls = []
         for item in response.output:
             if item.type == "computer_call":
+                # Queue every computer call so they can all be answered in one round-trip.
                 self.next_action = "computer_call_output"
                 self.call_id = item.call_id
-                self.computer_action_args = vars(item.action) | {}
-                self.computer_action = self.computer_action_args.pop("type")
-                if self.computer_action == "drag":
+                action_args = dict(vars(item.action))
+                action = action_args.pop("type")
+                if action == "drag":
                     path = [{"x": point.x, "y": point.y} for point in item.action.path]
-                    self.computer_action_args["path"] = path
-                self.pending_safety_checks = item.pending_safety_checks
+                    action_args["path"] = path
+                self.computer_calls.append(
+                    {
+                        "call_id": item.call_id,
+                        "action": action,
+                        "args": action_args,
+                        "pending_safety_checks": item.pending_safety_checks,
+                    }
+                )
+                self.pending_safety_checks = [
+                    *self.pending_safety_checks,
+                    *item.pending_safety_checks,
+                ]
             elif item.type == "reasoning":
                 self.reasoning_summary = "".join([entry.text for entry in item.summary])
             elif item.type == "message":
@@ -57,43 +73,52 @@ class State:
 class Scaler:
     """Wrapper for a computer that performs resizing and coordinate translation."""
 
-    def __init__(self, computer, dimensions=None):
+    def __init__(self, computer, dimensions=None, image_format="jpeg"):
+        if image_format not in ("jpeg", "png"):
+            raise ValueError(f"Unsupported image format '{image_format}'.")
         self.computer = computer
-        self.dimensions = dimensions
-        if not self.dimensions:
-            # If no dimensions are given, take a screenshot and scale to fit in 2048px
-            # https://platform.openai.com/docs/guides/images
-            image = self._screenshot()
-            width, height = image.size
-            max_size = 2048
-            longest = max(width, height)
-            if longest <= max_size:
-                self.dimensions = (width, height)
-            else:
-                scale = max_size / longest
-                self.dimensions = (int(width * scale), int(height * scale))
+        # The requested bounding box; the advertised dimensions are fitted inside it.
+        self.max_dimensions = dimensions
+        self.image_format = image_format
+        self._enc_buf = io.BytesIO()
+        image = self._screenshot()
+        width, height = image.size
         self.environment = computer.environment
-        self.screen_width = -1
-        self.screen_height = -1
+        # Seed the scale from the screenshot above so that actions arriving before
+        # the first screenshot() are translated too.
+        self.screen_width, self.screen_height = width, height
+        self._update_scale()
 
     def screenshot(self) -> str:
         # Take a screenshot from the actual computer
         image = self._screenshot()
+        if image.mode != "RGB":
+            # Drop alpha before resizing so the filter runs on three channels.
+            image = image.convert("RGB")
         # Scale the screenshot
         self.screen_width, self.screen_height = image.size
-        width, height = self.dimensions
-        ratio = min(width / self.screen_width, height / self.screen_height)
-        new_width = int(self.screen_width * ratio)
-        new_height = int(self.screen_height * ratio)
-        new_size = (new_width, new_height)
-        resized_image = image.resize(new_size, PIL.Image.Resampling.LANCZOS)
-        image = PIL.Image.new("RGB", (width, height), (0, 0, 0))
-        image.paste(resized_image, (0, 0))
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
+        if (self.screen_width, self.screen_height) != self._cached_dims:
+            self._update_scale()
+        if image.size != self.dimensions:
+            # Resize to exactly the advertised size; the dimensions are already fitted
+            # to the screen's aspect ratio. reducing_gap box-reduces large downscales first.
+            image = image.resize(
+                self.dimensions, PIL.Image.Resampling.LANCZOS, reducing_gap=2.0
+            )
+        # Overwrite the previous frame in place and trim the leftover tail afterwards,
+        # rather than growing a new buffer from empty every turn.
+        buffer = self._enc_buf
         buffer.seek(0)
-        data = bytearray(buffer.getvalue())
-        return base64.b64encode(data).decode("utf-8")
+        if self.image_format == "jpeg":
+            # Huffman optimization is the slow part of JPEG encoding, so skip it.
+            image.save(buffer, format="JPEG", quality=85, optimize=False, subsampling=2)
+        else:
+            # zlib level 1 is several times faster than the default 6 on screenshots.
+            image.save(buffer, format="PNG", compress_level=1, optimize=False)
+        buffer.truncate()
+        # Release the view before returning; BytesIO cannot resize while it is exported.
+        with buffer.getbuffer() as data:
+            return pybase64.b64encode_as_string(data)
 
     def click(self, x: int, y: int, button: str = "left") -> None:
         x, y = self._point_to_screen_coords(x, y)
@@ -121,25 +146,50 @@ class Scaler:
         self.computer.keypress(keys)
 
     def drag(self, path: list[dict[str, int]]) -> None:
-        for point in path:
-            x, y = self._point_to_screen_coords(point["x"], point["y"])
-            point["x"] = x
-            point["y"] = y
+        points = [self._point_to_screen_coords(point["x"], point["y"]) for point in path]
+        path = [{"x": x, "y": y} for x, y in points]
         self.computer.drag(path)
 
     def _screenshot(self):
         # Take screenshot from the actual computer.
+        if hasattr(self.computer, "screenshot_pil"):
+            # Skip the base64 PNG round trip when the computer can hand over an image.
+            return self.computer.screenshot_pil()
         screenshot = self.computer.screenshot()
-        screenshot = base64.b64decode(screenshot)
+        screenshot = pybase64.b64decode(screenshot, validate=False)
         buffer = io.BytesIO(screenshot)
-        return PIL.Image.open(buffer)
+        image = PIL.Image.open(buffer)
+        # Decode once up front so that later size and resize calls do not re-read.
+        image.load()
+        return image
+
+    def _update_scale(self):
+        # Only recomputed when the screen size changes. The dimensions are re-fitted
+        # to the screen's aspect ratio so that screenshots can be sent without padding.
+        if not self.max_dimensions:
+            # If no dimensions are given, scale to fit in 2048px
+            # https://platform.openai.com/docs/guides/images
+            max_size = 2048
+            max_width, max_height = max_size, max_size
+            scale = min(max_size / max(self.screen_width, self.screen_height), 1)
+        else:
+            # Screenshots are never enlarged.
+            max_width, max_height = self.max_dimensions
+            scale = min(max_width / self.screen_width, max_height / self.screen_height, 1)
+        # Round and clamp so that float error cannot shave a pixel off the box.
+        self.dimensions = (
+            min(max_width, self.screen_width, round(self.screen_width * scale)),
+            min(max_height, self.screen_height, round(self.screen_height * scale)),
+        )
+        # Map with the size of the image actually sent, per axis, so that integer
+        # rounding of the dimensions cannot push coordinates off screen.
+        width, height = self.dimensions
+        self._cached_dims = (self.screen_width, self.screen_height)
+        self._cached_inv_ratio = (self.screen_width / width, self.screen_height / height)
 
     def _point_to_screen_coords(self, x, y):
-        width, height = self.dimensions
-        ratio = min(width / self.screen_width, height / self.screen_height)
-        x = x / ratio
-        y = y / ratio
-        return int(x), int(y)
+        inv_x, inv_y = self._cached_inv_ratio
+        return int(x * inv_x), int(y * inv_y)
 
 
 class Agent:
@@ -151,9 +201,10 @@ class Agent:
         self.computer = computer
         self.state = None
         self.tools = {}
+        self._tools_cache = None
 
-    def start_task(self, user_message):
-        response = self.client.responses.create(
+    async def start_task(self, user_message):
+        response = await self.client.responses.create(
             model=self.model,
             input=user_message,
             tools=self.get_tools(),
@@ -164,6 +215,7 @@ class Agent:
     def add_tool(self, tool, func):
         name = tool["name"]
         self.tools[name] = (tool, func)
+        self._tools_cache = None
 
     @property
     def requires_user_input(self):
@@ -185,49 +237,60 @@ class Agent:
     def message(self):
         return self.state.message
 
-    def continue_task(self, user_message=""):
+    async def continue_task(self, user_message=""):
         screenshot = ""
         previous_response_id = self.state.previous_response_id
         if self.state.next_action == "computer_call_output":
-            action = self.state.computer_action
-            action_args = self.state.computer_action_args
-            logger.info("%s %s", action, action_args)
-            method = getattr(self.computer, action)
-            method(**action_args)
-            screenshot = self.computer.screenshot()
-            print(f"----- Action: {self.state.next_action}")
-            print(f"----- call_id: {self.state.call_id}")
-            next_input = openai.types.responses.response_input_param.ComputerCallOutput(
-                type="computer_call_output",
-                call_id=self.state.call_id,
-                output=openai.types.responses.response_input_param.ResponseComputerToolCallOutputScreenshotParam(
-                    type="computer_screenshot",
-                    image_url=f"data:image/png;base64,{screenshot}",
-                ),
-                acknowledged_safety_checks=self.state.pending_safety_checks,
+            computer_calls = self.state.computer_calls
+            for call in computer_calls:
+                logger.info("%s %s", call["action"], call["args"])
+                method = getattr(self.computer, call["action"])
+                # Actions and screenshots block, so keep them off the event loop.
+                await asyncio.to_thread(method, **call["args"])
+            # One screenshot after the last action answers every queued call.
+            screenshot = await asyncio.to_thread(self.computer.screenshot)
+            image_format = getattr(self.computer, "image_format", "png")
+            call_ids = [call["call_id"] for call in computer_calls]
+            logger.debug("Action=%s call_id=%s", self.state.next_action, call_ids)
+            output = openai.types.responses.response_input_param.ResponseComputerToolCallOutputScreenshotParam(
+                type="computer_screenshot",
+                image_url=f"data:image/{image_format};base64,{screenshot}",
             )
+            next_input = [
+                openai.types.responses.response_input_param.ComputerCallOutput(
+                    type="computer_call_output",
+                    call_id=call["call_id"],
+                    output=output,
+                    acknowledged_safety_checks=call["pending_safety_checks"],
+                )
+                for call in computer_calls
+            ]
         elif self.state.next_action == "function_call":
             if self.state.tool_name not in self.tools:
                 raise ValueError(f"Unsupported tool '{self.state.tool_name}'.")
             tool, func = self.tools[self.state.tool_name]
-            result = func(**self.state.tool_args)
-            next_input = openai.types.responses.response_input_param.FunctionCallOutput(
-                type="function_call_output",
-                call_id=self.state.call_id,
-                output=json.dumps(result),
-            )
+            result = await asyncio.to_thread(func, **self.state.tool_args)
+            next_input = [
+                openai.types.responses.response_input_param.FunctionCallOutput(
+                    type="function_call_output",
+                    call_id=self.state.call_id,
+                    output=json.dumps(result),
+                )
+            ]
         else:
-            next_input = openai.types.responses.response_input_param.Message(
-                role="user", content=user_message
-            )
+            next_input = [
+                openai.types.responses.response_input_param.Message(
+                    role="user", content=user_message
+                )
+            ]
         self.state = None
         wait_time = 0
-        for _ in range(10):
+        for attempt in range(10):
             try:
-                time.sleep(wait_time)
-                next_response = self.client.responses.create(
+                await asyncio.sleep(wait_time)
+                next_response = await self.client.responses.create(
                     model=self.model,
-                    input=[next_input],
+                    input=next_input,
                     previous_response_id=previous_response_id,
                     tools=self.get_tools(),
                     reasoning={"generate_summary": "concise"},
@@ -236,14 +299,25 @@ class Agent:
                 self.state = State(next_response)
                 return
             except openai.RateLimitError as e:
-                match = re.search(r"Please try again in (\d+)s", e.message)
-                wait_time = int(match.group(1)) if match else 10
-                logger.info("Rate limit exceeded. Waiting for %s seconds.", wait_time)
+                match = _RATELIMIT_RE.search(e.message)
+                requested = int(match.group(1)) if match else 0
+                backoff = min(2**attempt, _MAX_BACKOFF)
+                wait_time = max(requested, backoff) + random.uniform(0, 1)
+                logger.info("Rate limit exceeded. Waiting for %.1f seconds.", wait_time)
+            except openai.APIConnectionError:
+                # Also covers timeouts; these are usually transient, so retry sooner.
+                backoff = min(0.5 * 2**attempt, _MAX_BACKOFF)
+                wait_time = backoff + random.uniform(0, 1)
+                logger.info("Connection error. Retrying in %.1f seconds.", wait_time)
         logger.critical("Max retries exceeded.")
 
     def get_tools(self):
-        tools = [entry[0] for entry in self.tools.values()]
-        return [self.computer_tool(), *tools]
+        # The computer's dimensions can change with the screen resolution.
+        dimensions = self.computer.dimensions
+        if self._tools_cache is None or self._tools_cache[0] != dimensions:
+            tools = [entry[0] for entry in self.tools.values()]
+            self._tools_cache = (dimensions, [self.computer_tool(), *tools])
+        return self._tools_cache[1]
 
     def computer_tool(self):
         return openai.types.responses.ComputerToolParam(
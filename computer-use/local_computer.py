@@ -3,6 +3,7 @@ import io
 import platform
 import time
 
+import PIL
 import pyautogui
 
 
@@ -23,14 +24,18 @@ class LocalComputer:
             raise NotImplementedError(f"Unsupported operating system: '{system}'")
 
     def screenshot(self) -> str:
-        screenshot = pyautogui.screenshot()
-        self.dimensions = screenshot.size
+        screenshot = self.screenshot_pil()
         buffer = io.BytesIO()
-        screenshot.save(buffer, format="PNG")
+        screenshot.save(buffer, format="PNG", compress_level=1, optimize=False)
         buffer.seek(0)
         data = bytearray(buffer.getvalue())
         return base64.b64encode(data).decode("utf-8")
 
+    def screenshot_pil(self) -> PIL.Image.Image:
+        screenshot = pyautogui.screenshot()
+        self.dimensions = screenshot.size
+        return screenshot
+
     def click(self, x: int, y: int, button: str = "left") -> None:
         width, height = self.dimensions
         if 0 <= x < width and 0 <= y < height:
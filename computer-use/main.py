@@ -5,15 +5,16 @@ Make sure to install the required packages before running the script.
 """
 
 import argparse
+import asyncio
 import logging
 import os
 
 import cua
 import local_computer
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, AsyncOpenAI
 
-def main():
+async def main():
     logging.basicConfig(level=logging.WARNING, format="%(message)s")
     logging.getLogger("cua").setLevel(logging.DEBUG)
 
@@ -32,13 +33,13 @@ def main():
 
     if args.endpoint == "azure":
         token_provider = get_bearer_token_provider(DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
-        client = AzureOpenAI(
+        client = AsyncAzureOpenAI(
             azure_ad_token_provider=token_provider,
             azure_endpoint="https://chattest-westus2-kel54xbecb3to.openai.azure.com",
             api_version="2025-03-01-preview"
         )
     else:
-        client = AzureOpenAI()
+        client = AsyncOpenAI()
 
     model = args.model
 
@@ -58,7 +59,7 @@ def main():
         user_message = input("Please enter the initial task for the computer: ")
 
     print(f"User: {user_message}")
-    agent.start_task(user_message)
+    await agent.start_task(user_message)
     while True:
         user_message = None
         if agent.requires_consent and not args.autoplay:
@@ -68,7 +69,7 @@ def main():
             input("Press Enter to acknowledge and continue...")
         elif agent.requires_user_input:
             user_message = input("User: ")
-        agent.continue_task(user_message)
+        await agent.continue_task(user_message)
         print("")
         if agent.reasoning_summary:
             print(f"Action: {agent.reasoning_summary}")
@@ -78,4 +79,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())